@@ -1,75 +1,88 @@
-from flask import Flask, render_template, request, make_response
+from flask import Flask, render_template, request, jsonify, send_file
+from werkzeug.datastructures import MultiDict
 import math
 import logging
-from weasyprint import HTML
+import os
+from io import BytesIO
+from bisect import bisect_left
+from functools import lru_cache
+from typing import NamedTuple
 
 app = Flask(__name__)
-logging.basicConfig(level=logging.DEBUG)
+# Set LOG_LEVEL=DEBUG to trace the intermediate values of each calculation
+_log_level = os.environ.get("LOG_LEVEL", "INFO").strip().upper()
+# An unknown name would make basicConfig raise at import and, with preload_app, take the gunicorn master down
+_log_level_valid = isinstance(logging.getLevelName(_log_level), int)
+logging.basicConfig(level=_log_level if _log_level_valid else logging.INFO)
+logger = logging.getLogger(__name__)
+if not _log_level_valid:
+    logger.warning("Unknown LOG_LEVEL %r, using INFO", _log_level)
 
 # Make built-in zip available in Jinja2 templates
 app.jinja_env.globals.update(zip=zip)
 
 def get_float(value, default=0.0):
     """Safely convert a value to float."""
+    # bool is an int subclass, but True/False are not measurements
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if not value or not isinstance(value, str):
+        return default
+    value = value.strip()
+    if not value:
+        return default
     try:
-        return float(value.strip()) if value and isinstance(value, str) else default
-    except Exception:
+        return float(value)
+    except ValueError:
         return default
 
+_ADDITIONAL_LOAD_SF = {"steel": 1.05, "concrete": 1.15, "timber": 1.15}
+
 def get_additional_load_sf(load_material):
-    """Return the safety factor for an additional load based on its material."""
-    if not load_material:
-        return 1.0
-    material = load_material.strip().lower()
-    if material == "steel":
-        return 1.05
-    elif material in ["concrete", "timber"]:
-        return 1.15
-    else:
-        return 1.0
+    """Return the safety factor for an additional load based on its lower-cased material."""
+    return _ADDITIONAL_LOAD_SF.get(load_material, 1.0)
 
 # ---------------- Steel Calculations ----------------
-def calculate_steel_capacity(steel_grade, flange_width, flange_thickness, web_thickness, web_depth, condition_factor):
-    steel_grade = steel_grade.strip()
-    fy = 230.0 if steel_grade == "S230" else (275.0 if steel_grade == "S275" else 355.0)
+_FY_MAP = {"S230": 230.0, "S275": 275.0, "S355": 355.0}
+_SQRT_FY_OVER_355 = {fy: math.sqrt(fy / 355.0) for fy in _FY_MAP.values()}
+_MPE_DIV = 1.0 / (1.05 * 1.1)  # 1 / (gamma_m x gamma_f3)
+_SQRT3 = math.sqrt(3.0)
+_SHEAR_DIV = 1.0 / (_SQRT3 * 1.05 * 1.1 * 1000)  # also converts N to kN
+
+@lru_cache(maxsize=1024)
+def calculate_steel_capacity(fy, flange_width, flange_thickness, web_thickness, web_depth, condition_factor):
     overall_depth = web_depth + 2 * flange_thickness  # overall depth in mm
+    web_clear = overall_depth - 2 * flange_thickness
     Z_plastic = (flange_width * flange_thickness * (overall_depth - flange_thickness) +
-                 (web_thickness * (overall_depth - 2 * flange_thickness)**2) / 4) # in mm³
-    MR = (fy * (Z_plastic/1e6) * lookup_factor)  # kNm
-    shear_capacity = (fy * web_thickness * overall_depth * condition_factor) / (1.73 * 1.05 * 1.1 * 1000)  # kN
-    logging.debug(f"Steel: overall_depth={overall_depth} mm, Z_plastic={Z_plastic:.6f} m³, MR={MR:.6f} kNm, shear={shear_capacity:.6f} kN")
+                 (web_thickness * web_clear * web_clear) / 4) # in mm³
+    MR = fy * (Z_plastic/1e6)  # kNm
+    shear_capacity = fy * web_thickness * overall_depth * condition_factor * _SHEAR_DIV  # kN
+    logger.debug("Steel: overall_depth=%s mm, Z_plastic=%.6f m³, MR=%.6f kNm, shear=%.6f kN", overall_depth, Z_plastic, MR, shear_capacity)
     return MR, shear_capacity
 
 # ---------------- Concrete Calculations ----------------
-def calculate_concrete_capacity(concrete_grade, beam_width, total_depth, reinforcement_layers,
+_CONCRETE_STRENGTHS = {"C32/40": (30, 40), "C40/50": (40, 50)}  # grade -> (f_ck, fcu)
+_QUARTER_PI = math.pi / 4  # bar area = _QUARTER_PI x diameter²
+
+def calculate_concrete_capacity(f_ck, fcu, beam_width, total_depth, reinforcement_layers,
                                 reinforcement_strength, condition_factor,
                                 partial_factor_concrete=1.5, partial_factor_reinf=1.15,
                                 partial_factor_shear=1.25):
-    if concrete_grade == "C32/40":
-        f_ck = 30
-        fcu = 40
-    else:
-        f_ck = 40
-        fcu = 50
     f_cd = f_ck / partial_factor_concrete
     f_y = reinforcement_strength
     f_y_design = f_y / partial_factor_reinf
 
     total_As = 0.0
     weighted_depth = 0.0
-    for num, dia, cover in zip(
-        request.form.getlist("reinforcement_num[]"),
-        request.form.getlist("reinforcement_diameter[]"),
-        request.form.getlist("reinforcement_cover[]")
-    ):
-        if num != "" and dia != "" and cover != "":
-            cover_val = get_float(cover)
-            if cover_val >= total_depth:
-                raise ValueError("Invalid reinforcement cover: cover must be less than total depth.")
-            A_layer = int(num) * (math.pi / 4) * (get_float(dia) ** 2)
-            total_As += A_layer
-            d_layer = total_depth - (cover_val + get_float(dia) / 2)
-            weighted_depth += A_layer * d_layer
+    for layer in reinforcement_layers:
+        cover_val = layer["layer_cover"]
+        if cover_val >= total_depth:
+            raise ValueError("Invalid reinforcement cover: cover must be less than total depth.")
+        dia_val = layer["bar_diameter"]
+        A_layer = layer["num_bars"] * _QUARTER_PI * (dia_val * dia_val)
+        total_As += A_layer
+        d_layer = total_depth - (cover_val + dia_val / 2)
+        weighted_depth += A_layer * d_layer
     if total_As == 0:
         raise ValueError("No reinforcement provided. Please enter valid reinforcement details.")
     d_eff = weighted_depth / total_As
@@ -77,7 +90,7 @@ def calculate_concrete_capacity(concrete_grade, beam_width, total_depth, reinfor
     z = min(z_calculated, 0.95 * d_eff)
     
     Mus = (f_y_design * total_As * z) / 1e6  # kNm
-    Muc = (0.225 * (fcu / 1.5) * beam_width * (d_eff ** 2)) / 1e6  # kNm
+    Muc = (0.225 * (fcu / 1.5) * beam_width * (d_eff * d_eff)) / 1e6  # kNm
     moment_capacity = min(Mus, Muc) * condition_factor
     
     Ss = (550 / d_eff) ** 0.25
@@ -86,39 +99,42 @@ def calculate_concrete_capacity(concrete_grade, beam_width, total_depth, reinfor
     vc = (0.24 / partial_factor_shear) * (((100 * total_As) / (beam_width * d_eff)) ** 0.333 * (fcu ** 0.333))
     Vu = Ss * vc * beam_width * d_eff
     Vu_kN = Vu / 1000.0
-    logging.debug(f"Concrete: f_ck={f_ck}, fcu={fcu}, f_cd={f_cd:.2f}, f_y_design={f_y_design:.2f}")
-    logging.debug(f"Reinf: total_As={total_As:.2f} mm², weighted_depth={weighted_depth:.2f} mm, d_eff={d_eff:.2f} mm, z_calculated={z_calculated:.2f} mm, z={z:.2f} mm")
-    logging.debug(f"Mus = {Mus:.6f} kNm, Muc = {Muc:.6f} kNm, chosen moment_capacity = {moment_capacity:.6f} kNm")
-    logging.debug(f"Ultimate Shear: Ss = {Ss:.4f}, vc = {vc:.4f}, Vu = {Vu_kN:.6f} kN")
+    logger.debug("Concrete: f_ck=%s, fcu=%s, f_cd=%.2f, f_y_design=%.2f", f_ck, fcu, f_cd, f_y_design)
+    logger.debug("Reinf: total_As=%.2f mm², weighted_depth=%.2f mm, d_eff=%.2f mm, z_calculated=%.2f mm, z=%.2f mm",
+                 total_As, weighted_depth, d_eff, z_calculated, z)
+    logger.debug("Mus = %.6f kNm, Muc = %.6f kNm, chosen moment_capacity = %.6f kNm", Mus, Muc, moment_capacity)
+    logger.debug("Ultimate Shear: Ss = %.4f, vc = %.4f, Vu = %.6f kN", Ss, vc, Vu_kN)
     
     return moment_capacity, Vu_kN, Mus, Muc, d_eff, total_As
 
 # ---------------- Timber Calculations ----------------
+# grade -> (bending_parallel, shear_parallel) in N/mm²; unknown grades use C16
+_TIMBER = {
+    "C16": (16.0, 1.8),
+    "C24": (24.0, 2.5),
+    "D40": (40.0, 4.0),
+    "D50": (50.0, 4.0),
+    "GL28c": (28.0, 3.2),
+    "GL28h": (28.0, 2.7),
+    "Birch": (26.1, 2.6),
+}
+
 def calculate_timber_beam(form_data):
-    timber_beam_width = get_float(form_data.get("timber_beam_width"))
-    timber_beam_depth = get_float(form_data.get("timber_beam_depth"))
-    timber_grade = form_data.get("timber_grade")
-    timber_K3 = get_float(form_data.get("timber_K3"))
+    g = form_data.get
+    gf = get_float
+    timber_beam_width = gf(g("timber_beam_width"))
+    timber_beam_depth = gf(g("timber_beam_depth"))
+    timber_grade = g("timber_grade")
+    timber_K3 = gf(g("timber_K3"))
     timber_K2 = 0.8
     timber_K7 = (300 / timber_beam_depth) ** 0.11 if timber_beam_depth > 0 else 0
 
-    timber_properties = {
-         "C16": {"bending_parallel": 16.0, "shear_parallel": 1.8},
-         "C24": {"bending_parallel": 24.0, "shear_parallel": 2.5},
-         "D40": {"bending_parallel": 40.0, "shear_parallel": 4.0},
-         "D50": {"bending_parallel": 50.0, "shear_parallel": 4.0},
-         "GL28c": {"bending_parallel": 28.0, "shear_parallel": 3.2},
-         "GL28h": {"bending_parallel": 28.0, "shear_parallel": 2.7},
-         "Birch": {"bending_parallel": 26.1, "shear_parallel": 2.6}
-    }
-    props = timber_properties.get(timber_grade, {"bending_parallel": 16.0, "shear_parallel": 1.8})
-    bending_parallel = props["bending_parallel"]
-    shear_parallel = props["shear_parallel"]
+    bending_parallel, shear_parallel = _TIMBER.get(timber_grade, _TIMBER["C16"])
 
     b1 = bending_parallel * timber_K2 * timber_K3 * timber_K7
     b2 = shear_parallel * timber_K2 * timber_K3 * timber_K7
 
-    Z = (timber_beam_width * (timber_beam_depth ** 2)) / 6.0
+    Z = (timber_beam_width * (timber_beam_depth * timber_beam_depth)) / 6.0
     timber_moment_capacity = (Z * b1) / 1e6
     timber_shear_capacity = (b2 * timber_beam_width * timber_beam_depth) / 1e3
 
@@ -140,12 +156,14 @@ def calculate_timber_beam(form_data):
 def calculate_effective_length(L, k1=1.0, k2=1.0):
     return k1 * k2 * L
 
+@lru_cache(maxsize=1024)
 def calculate_radius_of_gyration_strong(B_f, t_f, t_w, web_depth):
     d = web_depth + 2 * t_f
-    A = 2 * (B_f * t_f) + t_w * (d - 2 * t_f)
-    I_x = (t_w ** 3 * (d - 2 * t_f)) / 12.0 + 2 * ((t_f * (B_f ** 3)) / 12.0)
+    d2 = d - 2 * t_f
+    A = 2 * (B_f * t_f) + t_w * d2
+    I_x = (t_w * t_w * t_w * d2) / 12.0 + 2 * ((t_f * (B_f * B_f * B_f)) / 12.0)
     r_x = math.sqrt(I_x / A)
-    logging.debug(f"Strong axis: A={A} mm², I_x={I_x} mm⁴, r_x={r_x} mm")
+    logger.debug("Strong axis: A=%s mm², I_x=%s mm⁴, r_x=%s mm", A, I_x, r_x)
     return r_x / 1000.0
 
 # --- K4 helpers (add these; do not remove existing functions) ---
@@ -156,13 +174,14 @@ def section_props_for_k4(B_f, t_f, t_w, web_depth_mm):
     """
     d = web_depth_mm + 2 * t_f
     h = d - 2 * t_f
-    A = 2 * (B_f * t_f) + t_w * (d - 2 * t_f)
+    A = 2 * (B_f * t_f) + t_w * h
 
-    Ix_web = (t_w * (d - 2*t_f)**3) / 12.0
-    Ix_fl  = 2 * ((B_f * t_f**3) / 12.0 + (B_f * t_f) * ((d/2 - t_f/2)**2))
+    Ix_web = (t_w * h * h * h) / 12.0
+    lever = d/2 - t_f/2
+    Ix_fl  = 2 * ((B_f * t_f * t_f * t_f) / 12.0 + (B_f * t_f) * (lever * lever))
     Ix = Ix_web + Ix_fl
 
-    Iy = 2 * ((t_f * B_f**3) / 12.0) + ((d - 2*t_f) * t_w**3) / 12.0
+    Iy = 2 * ((t_f * B_f * B_f * B_f) / 12.0) + (h * t_w * t_w * t_w) / 12.0
 
     return A, d, h, Ix, Iy
 
@@ -174,7 +193,8 @@ def k4_minor_axis(Z_plastic_mm3, A_mm2, h_mm, Ix_mm4, Iy_mm4):
     if ratio <= 0:
         return 1.0
 
-    val = (4.0 * (Z_plastic_mm3 ** 2) / (A_mm2 ** 2 * h_mm ** 2)) * ratio
+    A_h = A_mm2 * h_mm
+    val = (4.0 * (Z_plastic_mm3 * Z_plastic_mm3) / (A_h * A_h)) * ratio
     val = max(val, 0.0)
 
     return val ** 0.25
@@ -200,76 +220,60 @@ lookup_table = {
     200: 0.180000
 }
 
+# Sorted breakpoints of lookup_table, built once at import
+_LU_X = tuple(sorted(lookup_table))
+_LU_Y = tuple(lookup_table[k] for k in _LU_X)
+
 def get_lookup_factor(X):
-    keys = sorted(lookup_table.keys())
-    if X <= keys[0]:
-        return lookup_table[keys[0]]
-    if X >= keys[-1]:
-        return lookup_table[keys[-1]]
-    for i in range(len(keys)-1):
-        if keys[i] <= X <= keys[i+1]:
-            fraction = (X - keys[i]) / (keys[i+1] - keys[i])
-            factor = lookup_table[keys[i]] + fraction * (lookup_table[keys[i+1]] - lookup_table[keys[i]])
-            logging.debug(f"X={X}, Lookup Factor={factor}")
-            return factor
-    return 1.0
+    if X <= _LU_X[0]:
+        return _LU_Y[0]
+    if X >= _LU_X[-1]:
+        return _LU_Y[-1]
+    i = bisect_left(_LU_X, X)
+    fraction = (X - _LU_X[i-1]) / (_LU_X[i] - _LU_X[i-1])
+    return _LU_Y[i-1] + fraction * (_LU_Y[i] - _LU_Y[i-1])
+
+# v against F, tabulated at integer F = 0..20
+_V_TABLE = (
+    1.000000, 0.988000, 0.956000, 0.912000, 0.864000, 0.817000, 0.774000,
+    0.734000, 0.699000, 0.668000, 0.639000, 0.614000, 0.591000, 0.571000,
+    0.552000, 0.535000, 0.519000, 0.505000, 0.492000, 0.479000, 0.468000,
+)
 
 def calculate_v_from_F(F):
-    table = {
-        0: 1.000000,
-        1: 0.988000,
-        2: 0.956000,
-        3: 0.912000,
-        4: 0.864000,
-        5: 0.817000,
-        6: 0.774000,
-        7: 0.734000,
-        8: 0.699000,
-        9: 0.668000,
-        10: 0.639000,
-        11: 0.614000,
-        12: 0.591000,
-        13: 0.571000,
-        14: 0.552000,
-        15: 0.535000,
-        16: 0.519000,
-        17: 0.505000,
-        18: 0.492000,
-        19: 0.479000,
-        20: 0.468000
-    }
     if F <= 0:
         return 1.0
     if F >= 20:
-        return table[20]
-    lower = int(math.floor(F))
-    upper = lower + 1
-    fraction = F - lower
-    v_val = table[lower] + fraction * (table[upper] - table[lower])
-    logging.debug(f"F={F}, v={v_val}")
-    return v_val
+        return _V_TABLE[20]
+    lower = int(F)
+    return _V_TABLE[lower] + (F - lower) * (_V_TABLE[lower + 1] - _V_TABLE[lower])
 
+@lru_cache(maxsize=1024)
 def calculate_slenderness(effective_length, web_depth, flange_thickness, B_f, t_w, k4=1.0):
     r = calculate_radius_of_gyration_strong(B_f, flange_thickness, t_w, web_depth)
     d = web_depth + 2 * flange_thickness
     F_param = (effective_length * flange_thickness) / (r * d)
     v = calculate_v_from_F(F_param)
     slenderness = (effective_length / r) * v * k4
-    logging.debug(f"Effective Length={effective_length}, r={r}, F={F_param}, v={v}, k4={k4}, slenderness={slenderness}")
+    logger.debug("Effective Length=%s, r=%s, F=%s, v=%s, k4=%s, slenderness=%s", effective_length, r, F_param, v, k4, slenderness)
     return slenderness, F_param, v, r
 
-def calculate_bd37_moment_capacity(MR, effective_length, steel_grade, flange_width, flange_thickness, web_thickness, web_depth, k4=1.0):
-    fy = 230.0 if steel_grade.strip() == "S230" else (275.0 if steel_grade.strip() == "S275" else 355.0)
+def calculate_bd37_moment_capacity(MR, effective_length, fy, flange_width, flange_thickness, web_thickness, web_depth, condition_factor, k4=1.0):
     slenderness, F_param, v_value, r = calculate_slenderness(effective_length, web_depth, flange_thickness, flange_width, web_thickness, k4=k4)
-    X = slenderness * math.sqrt(fy / 355.0) if MR != 0 else 0.0
+    X = slenderness * _SQRT_FY_OVER_355[fy] if MR != 0 else 0.0
     lookup_factor = get_lookup_factor(X)
-    MD = (lookup_factor * MR * condition_factor) / (1.05 * 1.1)
-    logging.debug(f"Steel: fy={fy}, slenderness={slenderness}, X={X}, k4={k4}, Lookup Factor={lookup_factor}, MD={MD}")
-    return MD, slenderness, X
+    MD = lookup_factor * MR * condition_factor * _MPE_DIV
+    logger.debug("Steel: fy=%s, slenderness=%s, X=%s, k4=%s, Lookup Factor=%s, MD=%s", fy, slenderness, X, k4, lookup_factor, MD)
+    return MD, slenderness, X, F_param, v_value, r
+
 
+# Wheel-load factor for each dispersion reduction (%) on the form; keyed by number
+# so "25", 25 and 25.0 all match, while "none" parses to 0.0 -> 1.0
+_WHEEL_DISPERSION_FACTOR = {25.0: 0.75, 50.0: 0.5}
 
-def calculate_vehicle_loads(span_length, vehicle_type, impact_factor=1.0, wheel_dispersion="none", axle_mode="per beam"):
-    vt = vehicle_type.strip().lower()
+def calculate_vehicle_loads(span_length, vehicle_type, impact_factor=1.0, wheel_dispersion=0.0, axle_mode="per beam"):
+    # vehicle_type and axle_mode arrive stripped and lower-cased from BeamInputs.from_form
+    vt = vehicle_type
     if vt == "3 tonne":
         spacing = 2.0
         P1 = 21.0
@@ -284,79 +288,83 @@ def calculate_vehicle_loads(span_length, vehicle_type, impact_factor=1.0, wheel_
         P2 = 113.0
     else:
         return {"Vehicle Maximum Moment (kNm)": 0.0, "Vehicle Maximum Shear (kN)": 0.0}
-    if axle_mode.strip().lower() == "per beam":
+    if axle_mode == "per beam":
         P1 /= 2.0
         P2 /= 2.0
-    P1 *= 1.3
-    P2 *= 1.3
-    reduction_factor = 1.0
-    try:
-        rd = float(wheel_dispersion)
-        if rd == 25:
-            reduction_factor = 0.75
-        elif rd == 50:
-            reduction_factor = 0.5
-    except:
-        reduction_factor = 1.0
-    P1 *= reduction_factor
-    P2 *= reduction_factor
+    # 1.3 load factor combined with the wheel-dispersion reduction
+    scale = 1.3 * _WHEEL_DISPERSION_FACTOR.get(wheel_dispersion, 1.0)
+    P1 *= scale
+    P2 *= scale
+    L = span_length
     worst_M = 0.0
     worst_V = 0.0
-    a_step = 0.01
-    x_step = 0.01
-    L = span_length
-    for a in drange(0, L - spacing, a_step):
-        b = a + spacing
-        R_A = (P1 * (L - a) + P2 * (L - b)) / L
-        M_max_for_a = 0.0
-        V_max_for_a = 0.0
-        x = 0.0
-        while x <= L:
-            if x <= a:
-                M = R_A * x
-            elif x <= b:
-                M = R_A * x - P1 * (x - a)
-            else:
-                M = R_A * x - P1 * (x - a) - P2 * (x - b)
-            if x < a:
-                V = R_A
-            elif x < b:
-                V = R_A - P1
-            else:
-                V = R_A - P1 - P2
-            M_max_for_a = max(M_max_for_a, abs(M))
-            V_max_for_a = max(V_max_for_a, abs(V))
-            x += x_step
-        worst_M = max(worst_M, M_max_for_a)
-        worst_V = max(worst_V, V_max_for_a)
+    a_max = L - spacing  # furthest lead-axle position with both axles on the span
+    if a_max >= 0:
+        P = P1 + P2
+        # The maximum moment occurs under an axle. With the lead axle at a, the moment
+        # under each axle is a concave parabola in a, so its maximum over
+        # [0, L - spacing] is at the vertex clipped to that range.
+        # Under P1 (x = a): M = a * (P*(L - a) - P2*spacing) / L
+        a1 = min(max((L - P2 * spacing / P) / 2, 0.0), a_max)
+        M1 = a1 * (P * (L - a1) - P2 * spacing) / L
+        # Under P2, with c = L - a - spacing its distance from the far support:
+        # M = c * (P*(L - c) - P1*spacing) / L
+        c2 = min(max((L - P1 * spacing / P) / 2, 0.0), a_max)
+        M2 = c2 * (P * (L - c2) - P1 * spacing) / L
+        worst_M = max(M1, M2)
+        # The maximum shear is a support reaction with the train against that support
+        worst_V = max(P1 + P2 * a_max / L, P2 + P1 * a_max / L)
     worst_M *= impact_factor
     worst_V *= impact_factor
     return {"Vehicle Maximum Moment (kNm)": worst_M, "Vehicle Maximum Shear (kN)": worst_V}
 
+# 0.76 reduction, 3.65 m notional lane and 2.5 m loaded-width basis folded into one coefficient
+_HA_COEF = 0.76 / (3.65 / 2.5) / 2.5
+_ACCESS_FACTOR = {"public": 1.5}  # any other access type uses 1.3
+
+@lru_cache(maxsize=256)
+def calculate_ha_base_loads(span_length, loaded_width, access_factor):
+    """Return (base_udl, effective_udl, kel, base_moment, base_shear) for HA loading."""
+    L = span_length
+    base_udl = 230 * (1 / L)**0.67
+    width_factor = _HA_COEF * loaded_width * access_factor
+    effective_udl = base_udl * width_factor
+    base_kel = 82
+    kel = base_kel * width_factor
+    base_moment = effective_udl * L * L * 0.125 + kel * L * 0.25
+    base_shear = effective_udl * L * 0.5 + kel * 0.5
+    return base_udl, effective_udl, kel, base_moment, base_shear
+
+@lru_cache(maxsize=256)
+def calculate_hb_base_loads(span_length, loaded_width, access_factor):
+    """Return (udl, effective_udl, base_moment, base_shear) for HB loading."""
+    L = span_length
+    udl = 45
+    point_load = 180
+    if loaded_width is not None and access_factor is not None:
+        effective_udl = udl * _HA_COEF * loaded_width * access_factor
+    else:
+        effective_udl = udl
+    base_moment = effective_udl * L * L * 0.125 + point_load * L * 0.25
+    base_shear = effective_udl * L * 0.5 + point_load * 0.5
+    return udl, effective_udl, base_moment, base_shear
+
 def calculate_applied_loads(span_length, loading_type, additional_loads, loaded_width=None, access_factor=None, lane_width=None):
+    L = span_length
+    L2 = L * L
+    half_L = L * 0.5
     if loading_type == "HA":
-        base_udl = 230 * (1 / span_length)**0.67
         if loaded_width is None or loaded_width <= 0:
             loaded_width = 3.65
         if access_factor is None:
             access_factor = 1.3
-        effective_udl = ((base_udl * 0.76) / (3.65 / 2.5)) * (loaded_width / 2.5) * access_factor
-        base_kel = 82
-        kel = ((base_kel * 0.76) / (3.65 / 2.5)) * (loaded_width / 2.5) * access_factor
-        base_moment = (effective_udl * span_length**2) / 8 + (kel * span_length) / 4
-        base_shear = (effective_udl * span_length) / 2 + (kel) / 2
+        base_udl, effective_udl, kel, base_moment, base_shear = calculate_ha_base_loads(L, loaded_width, access_factor)
         default_loads = {"base_udl": base_udl, "effective_udl": effective_udl, "kel": kel}
     elif loading_type == "HB":
-        udl = 45
-        point_load = 180
-        if loaded_width is not None and access_factor is not None:
-            effective_udl = ((udl * 0.76) / (3.65 / 2.5)) * (loaded_width / 2.5) * access_factor
-        else:
-            effective_udl = udl
-        default_loads = {"udl": udl, "effective_udl": effective_udl}
-        base_moment = (effective_udl * span_length**2) / 8 + (point_load * span_length) / 4
-        base_shear = (effective_udl * span_length) / 2 + point_load / 2
+        base_udl, effective_udl, base_moment, base_shear = calculate_hb_base_loads(L, loaded_width, access_factor)
+        default_loads = {"udl": base_udl, "effective_udl": effective_udl}
     else:
+        base_udl = 0
         base_moment = 0
         base_shear = 0
         default_loads = {"udl": 0, "effective_udl": 0}
@@ -364,83 +372,137 @@ def calculate_applied_loads(span_length, loading_type, additional_loads, loaded_
     additional_dead = 0.0
     additional_live = 0.0
     additional_shear = 0.0
-    applied_load_breakdown = "\nApplied Load Calculation Process:\n----------------------------------\n"
-    applied_load_breakdown += f"Base UDL = {base_udl:.3f} kN/m, Loaded Width = {loaded_width}, Access Factor = {access_factor}\n"
-    applied_load_breakdown += f"Effective UDL = {default_loads.get('effective_udl'):.3f} kN/m, HA KEL = {default_loads.get('kel'):.3f} kN\n"
-    applied_load_breakdown += f"Base Moment = {base_moment:.3f} kNm, Base Shear = {base_shear:.3f} kN\n"
+    breakdown_lines = ["\nApplied Load Calculation Process:\n----------------------------------\n"]
+    breakdown_lines.append(f"Base UDL = {base_udl:.3f} kN/m, Loaded Width = {loaded_width}, Access Factor = {access_factor}\n")
+    breakdown_lines.append(f"Effective UDL = {default_loads.get('effective_udl'):.3f} kN/m, HA KEL = {default_loads.get('kel', 0):.3f} kN\n")
+    breakdown_lines.append(f"Base Moment = {base_moment:.3f} kNm, Base Shear = {base_shear:.3f} kN\n")
+    # Moment and shear per unit load for each distribution, resolved once per call
+    load_coefficients = {
+        "udl": (L2 * 0.125, half_L),
+        "point": (L * 0.25, 0.5),
+    }
     for load in additional_loads:
         try:
-            load_value = load.get("value", 0)
-            distribution = load.get("load_distribution", "").lower()
-            if not distribution:
-                distribution = ""
-            load_type_str = load.get("type", "").lower() or "live"
-            load_material = load.get("load_material", "steel").lower()
-            if distribution == "udl":
-                add_moment = (load_value * span_length**2) / 8
-                add_shear = (load_value * span_length) / 2
-            elif distribution == "point":
-                add_moment = (load_value * span_length) / 4
-                add_shear = load_value / 2
-            else:
-                add_moment = 0
-                add_shear = 0
+            load_value = load["value"]
+            distribution = load["load_distribution"]
+            load_type_str = load["type"]
+            load_material = load["load_material"]
+            moment_coef, shear_coef = load_coefficients.get(distribution, (0, 0))
+            add_moment = load_value * moment_coef
+            add_shear = load_value * shear_coef
             if load_type_str == "dead":
                 sf = get_additional_load_sf(load_material)
                 additional_dead += add_moment * sf
-                applied_load_breakdown += f"Additional Dead Load ({load['description']}): {load_value} with SF {sf} => Moment: {add_moment*sf:.3f} kNm, Shear: {add_shear:.3f} kN\n"
+                breakdown_lines.append(f"Additional Dead Load ({load['description']}): {load_value} with SF {sf} => Moment: {add_moment*sf:.3f} kNm, Shear: {add_shear:.3f} kN\n")
             else:
                 additional_live += add_moment
-                applied_load_breakdown += f"Additional Live Load ({load['description']}): {load_value} => Moment: {add_moment:.3f} kNm, Shear: {add_shear:.3f} kN\n"
+                breakdown_lines.append(f"Additional Live Load ({load['description']}): {load_value} => Moment: {add_moment:.3f} kNm, Shear: {add_shear:.3f} kN\n")
             additional_shear += add_shear
         except Exception as e:
-            logging.error(f"Error processing additional load: {load} - {e}")
+            logger.error("Error processing additional load: %s - %s", load, e)
     total_applied_moment = base_moment + additional_dead + additional_live
-    total_applied_shear = (default_loads.get("effective_udl", 0) * span_length) / 2 + (kel if loading_type=="HA" else 0) + additional_shear
-    applied_load_breakdown += f"Total Applied Moment = {total_applied_moment:.3f} kNm, Total Applied Shear = {total_applied_shear:.3f} kN\n"
-    return total_applied_moment, total_applied_shear, default_loads, additional_dead, additional_live, applied_load_breakdown
+    total_applied_shear = default_loads.get("effective_udl", 0) * half_L + (kel if loading_type=="HA" else 0) + additional_shear
+    breakdown_lines.append(f"Total Applied Moment = {total_applied_moment:.3f} kNm, Total Applied Shear = {total_applied_shear:.3f} kN\n")
+    return total_applied_moment, total_applied_shear, default_loads, additional_dead, additional_live, "".join(breakdown_lines)
+
+class BeamInputs(NamedTuple):
+    """Scalar inputs to calculate_beam_capacity, parsed once from the submitted form."""
+    material: str
+    condition_factor: float
+    span_length: float
+    effective_member_length: float
+    k1: float
+    k2: float
+    loading_type: str
+    loaded_width: float
+    access_type: str
+    steel_grade: str
+    flange_width: float
+    flange_thickness: float
+    web_thickness: float
+    web_depth: float
+    concrete_grade: str
+    beam_width: float
+    concrete_beam_depth: float
+    reinforcement_strength: float
+    vehicle_type: str
+    vehicle_impact_factor: float
+    wheel_dispersion: float
+    axle_load_mode: str
+
+    @classmethod
+    def from_form(cls, form_data):
+        g = form_data.get
+        gf = get_float
+        span_length = gf(g("span_length"))
+        return cls(
+            material=g("material"),
+            condition_factor=gf(g("condition_factor"), 1.0),
+            span_length=span_length,
+            effective_member_length=gf(g("effective_member_length"), span_length),
+            k1=gf(g("k1"), 1.0),
+            k2=gf(g("k2"), 1.0),
+            loading_type=g("loading_type"),
+            loaded_width=gf(g("loaded_width"), 3.65),
+            access_type=g("access_type", "Company"),
+            steel_grade=g("steel_grade", "").strip().upper(),
+            flange_width=gf(g("flange_width")),
+            flange_thickness=gf(g("flange_thickness")),
+            web_thickness=gf(g("web_thickness")),
+            web_depth=gf(g("beam_depth")),
+            concrete_grade=g("concrete_grade"),
+            beam_width=gf(g("beam_width")),
+            concrete_beam_depth=gf(g("concrete_beam_depth")) or gf(g("beam_depth")),
+            reinforcement_strength=gf(g("reinforcement_strength"), 500.0),
+            vehicle_type=g("vehicle_type", "").strip().lower(),
+            vehicle_impact_factor=gf(g("vehicle_impact_factor"), 1.0),
+            wheel_dispersion=gf(g("wheel_dispersion")),
+            axle_load_mode=g("axle_load_mode", "per beam").strip().lower(),
+        )
 
-def calculate_beam_capacity(form_data, loads):
-    material = form_data.get("material")
+def calculate_beam_capacity(form_data, loads, reinforcement=None):
+    inputs = BeamInputs.from_form(form_data)
+    material = inputs.material
 
     # --- DEBUG: log raw and parsed values ---
-    logging.debug("Raw condition_factor in form_data: %r", form_data.get("condition_factor"))
-    condition_factor = get_float(form_data.get("condition_factor"), 1.0)
-    logging.debug("Parsed condition_factor: %s", condition_factor)
-
-    span_length = get_float(form_data.get("span_length"))
-    L_actual = get_float(form_data.get("effective_member_length"), span_length)
-    k1 = get_float(form_data.get("k1"), 1.0)
-    k2 = get_float(form_data.get("k2"), 1.0)
-    effective_length = calculate_effective_length(L_actual, k1, k2)
-    loading_type = form_data.get("loading_type")
-
-    loaded_width = get_float(form_data.get("loaded_width"), 3.65)
-    access_str = form_data.get("access_type", "Company")
-    access_factor = 1.5 if access_str.lower() == "public" else 1.3
-
-    calculation_process = ""
+    logger.debug("Raw condition_factor in form_data: %r", form_data.get("condition_factor"))
+    condition_factor = inputs.condition_factor
+    logger.debug("Parsed condition_factor: %s", condition_factor)
+
+    span_length = inputs.span_length
+    k1 = inputs.k1
+    k2 = inputs.k2
+    effective_length = calculate_effective_length(inputs.effective_member_length, k1, k2)
+    loading_type = inputs.loading_type
+
+    loaded_width = inputs.loaded_width
+    access_str = inputs.access_type
+    access_factor = _ACCESS_FACTOR.get(access_str.lower(), 1.3)
+
+    process_lines = []  # breakdown text, joined once below
     # Predeclare to avoid NameErrors in result section
     shear_capacity = 0.0
     k4 = 1.0
 
     if material == "Steel":
-        steel_grade = form_data.get("steel_grade")
-        flange_width = get_float(form_data.get("flange_width"))
-        flange_thickness = get_float(form_data.get("flange_thickness"))
-        web_thickness = get_float(form_data.get("web_thickness"))
-        web_depth = get_float(form_data.get("beam_depth"))
+        steel_grade = inputs.steel_grade
+        fy = _FY_MAP.get(steel_grade, 355.0)
+        flange_width = inputs.flange_width
+        flange_thickness = inputs.flange_thickness
+        web_thickness = inputs.web_thickness
+        web_depth = inputs.web_depth
 
         # Base section capacity (returns MR, shear)
         MR, shear_capacity = calculate_steel_capacity(
-            steel_grade, flange_width, flange_thickness, web_thickness, web_depth, condition_factor
+            fy, flange_width, flange_thickness, web_thickness, web_depth, condition_factor
         )
 
         # Compute Z_plastic locally (m^3) for reporting AND for k4
         overall_depth = web_depth + 2 * flange_thickness
+        web_clear = overall_depth - 2 * flange_thickness
         Z_plastic = (
             flange_width * flange_thickness * (overall_depth - flange_thickness)
-            + (web_thickness * (overall_depth - 2 * flange_thickness) ** 2) / 4
+            + (web_thickness * web_clear * web_clear) / 4
         ) 
 
         # k4 (minor-axis symmetric I/L-section)
@@ -449,54 +511,45 @@ def calculate_beam_capacity(form_data, loads):
         )
 
         k4 = k4_minor_axis(Z_plastic, A_mm2, h_mm, Ix_mm4, Iy_mm4)
-        logging.debug(f"Section props for k4: A={A_mm2:.1f} mm², d={d_mm:.1f} mm, h={h_mm:.1f} mm, Ix={Ix_mm4:.1f} mm⁴, Iy={Iy_mm4:.1f} mm⁴")
-        logging.debug(f"Z_plastic input to k4 (m³)={Z_plastic:.6e}, converted to mm³={Z_plastic*1e9:.1f}")
-        logging.debug(f"Calculated k4 = {k4:.3f}")
+        logger.debug("Section props for k4: A=%.1f mm², d=%.1f mm, h=%.1f mm, Ix=%.1f mm⁴, Iy=%.1f mm⁴",
+                     A_mm2, d_mm, h_mm, Ix_mm4, Iy_mm4)
+        logger.debug("Z_plastic input to k4 (m³)=%.6e, converted to mm³=%.1f", Z_plastic, Z_plastic*1e9)
+        logger.debug("Calculated k4 = %.3f", k4)
 
         # BD37 capacity using k4
-        try:
-            MD, slenderness, X = calculate_bd37_moment_capacity(
-                MD, effective_length, steel_grade,
-                flange_width, flange_thickness, web_thickness, web_depth,
-                k4=k4
-            )
-            moment_capacity = MD
-        except Exception as e:
-            logging.error("Error in BD37 capacity calculation: %s", e)
-            slenderness, _, _, _ = calculate_slenderness(
-                effective_length, web_depth, flange_thickness, flange_width, web_thickness, k4=k4
-            )
-            fy_fallback = 230.0 if steel_grade.strip() == "S230" else (275.0 if steel_grade.strip() == "S275" else 355.0)
-            X = slenderness * math.sqrt(fy_fallback / 355.0) if MR != 0 else 0.0
-            moment_capacity = MR  # fallback to plastic
+        MD, slenderness, X, F_param, v_value, r = calculate_bd37_moment_capacity(
+            MR, effective_length, fy,
+            flange_width, flange_thickness, web_thickness, web_depth,
+            condition_factor, k4=k4
+        )
+        moment_capacity = MD
 
         # Breakdown text
-        calculation_process += "Steel Beam Calculation Process:\n----------------------------------\n"
-        calculation_process += f"Steel Grade: {steel_grade}\n"
-        calculation_process += f"Flange: Width = {flange_width} mm, Thickness = {flange_thickness} mm\n"
-        calculation_process += f"Web: Thickness = {web_thickness} mm, Depth = {web_depth} mm\n"
-        calculation_process += f"Overall Depth = {web_depth} + 2 x {flange_thickness} = {overall_depth} mm\n"
-        calculation_process += f"Plastic Section Modulus, Z_plastic = {Z_plastic:.6f} m³\n"
-        fy = 230.0 if steel_grade.strip() == "S230" else (275.0 if steel_grade.strip() == "S275" else 355.0)
-        calculation_process += f"Yield Strength, fy = {fy} N/mm²\n"
-        calculation_process += f"k4 (minor-axis symmetry) = {k4:.3f}\n"
-        calculation_process += f"MR = (fy x Z_plastic)  = {MR:.3f} kNm\n"
-        calculation_process += f"Slenderness = {slenderness:.3f}, X = {X:.3f}\n"
-        calculation_process += f"Lookup Factor = {get_lookup_factor(X):.3f}\n"
-        calculation_process += f"Adjusted Moment Capacity, MD = Lookup Factor x MR x Condition Factor / (1.05 x 1.1) = {moment_capacity:.3f} kNm\n"
-        calculation_process += "----------------------------------\n"
+        process_lines.append("Steel Beam Calculation Process:\n----------------------------------\n")
+        process_lines.append(f"Steel Grade: {steel_grade}\n")
+        process_lines.append(f"Flange: Width = {flange_width} mm, Thickness = {flange_thickness} mm\n")
+        process_lines.append(f"Web: Thickness = {web_thickness} mm, Depth = {web_depth} mm\n")
+        process_lines.append(f"Overall Depth = {web_depth} + 2 x {flange_thickness} = {overall_depth} mm\n")
+        process_lines.append(f"Plastic Section Modulus, Z_plastic = {Z_plastic:.6f} m³\n")
+        process_lines.append(f"Yield Strength, fy = {fy} N/mm²\n")
+        process_lines.append(f"k4 (minor-axis symmetry) = {k4:.3f}\n")
+        process_lines.append(f"MR = (fy x Z_plastic)  = {MR:.3f} kNm\n")
+        process_lines.append(f"Slenderness = {slenderness:.3f}, X = {X:.3f}\n")
+        process_lines.append(f"Lookup Factor = {get_lookup_factor(X):.3f}\n")
+        process_lines.append(f"Adjusted Moment Capacity, MD = Lookup Factor x MR x Condition Factor / (1.05 x 1.1) = {moment_capacity:.3f} kNm\n")
+        process_lines.append("----------------------------------\n")
 
     elif material == "Concrete":
-        concrete_grade = form_data.get("concrete_grade")
-        beam_width = get_float(form_data.get("beam_width"))
-        total_depth = get_float(form_data.get("concrete_beam_depth"))
-        if total_depth == 0:
-            total_depth = get_float(form_data.get("beam_depth"))
+        concrete_grade = inputs.concrete_grade
+        f_ck, fcu = _CONCRETE_STRENGTHS.get(concrete_grade, (40, 50))
+        beam_width = inputs.beam_width
+        total_depth = inputs.concrete_beam_depth
 
-        reinforcement_nums = request.form.getlist("reinforcement_num[]")
-        reinforcement_diameters = request.form.getlist("reinforcement_diameter[]")
-        reinforcement_covers = request.form.getlist("reinforcement_cover[]")
-        reinforcement_strength = get_float(form_data.get("reinforcement_strength"), 500.0)
+        reinforcement = reinforcement or {}
+        reinforcement_nums = reinforcement.get("reinforcement_nums", [])
+        reinforcement_diameters = reinforcement.get("reinforcement_diameters", [])
+        reinforcement_covers = reinforcement.get("reinforcement_covers", [])
+        reinforcement_strength = inputs.reinforcement_strength
 
         reinforcement_layers = []
         for num, dia, cover in zip(reinforcement_nums, reinforcement_diameters, reinforcement_covers):
@@ -511,7 +564,7 @@ def calculate_beam_capacity(form_data, loads):
 
         try:
             moment_capacity_conc, shear_capacity, Mus, Muc, d_eff, total_As = calculate_concrete_capacity(
-                concrete_grade, beam_width, total_depth, reinforcement_layers,
+                f_ck, fcu, beam_width, total_depth, reinforcement_layers,
                 reinforcement_strength=reinforcement_strength, condition_factor=condition_factor
             )
         except Exception as e:
@@ -520,30 +573,30 @@ def calculate_beam_capacity(form_data, loads):
         moment_capacity = moment_capacity_conc
         effective_depth = d_eff
 
-        calculation_process += "Concrete Beam Calculation Process:\n----------------------------------\n"
-        calculation_process += f"Concrete Grade: {concrete_grade}\n"
-        calculation_process += f"Beam Width = {beam_width} mm, Total Depth = {total_depth} mm\n"
-        calculation_process += f"Effective Depth (d_eff) = {effective_depth:.3f} mm\n"
-        calculation_process += f"Total Reinforcement Area = {total_As:.3f} mm²\n"
-        calculation_process += f"Mus (Reinforcement Moment) = {Mus:.3f} kNm\n"
-        calculation_process += f"Muc (Concrete Moment) = {Muc:.3f} kNm\n"
-        calculation_process += f"Chosen Moment Capacity = min(Mus, Muc) x condition factor = {moment_capacity:.3f} kNm\n"
-        calculation_process += "----------------------------------\n"
+        process_lines.append("Concrete Beam Calculation Process:\n----------------------------------\n")
+        process_lines.append(f"Concrete Grade: {concrete_grade}\n")
+        process_lines.append(f"Beam Width = {beam_width} mm, Total Depth = {total_depth} mm\n")
+        process_lines.append(f"Effective Depth (d_eff) = {effective_depth:.3f} mm\n")
+        process_lines.append(f"Total Reinforcement Area = {total_As:.3f} mm²\n")
+        process_lines.append(f"Mus (Reinforcement Moment) = {Mus:.3f} kNm\n")
+        process_lines.append(f"Muc (Concrete Moment) = {Muc:.3f} kNm\n")
+        process_lines.append(f"Chosen Moment Capacity = min(Mus, Muc) x condition factor = {moment_capacity:.3f} kNm\n")
+        process_lines.append("----------------------------------\n")
 
     elif material == "Timber":
         timber_results = calculate_timber_beam(form_data)
         moment_capacity = timber_results.get("Timber Bending Capacity (kNm)")
         shear_capacity = timber_results.get("Timber Shear Capacity (kN)")
-        calculation_process += "Timber Beam Calculation Process:\n----------------------------------\n"
-        calculation_process += f"Timber Grade: {form_data.get('timber_grade')}\n"
-        calculation_process += f"Beam Width = {form_data.get('timber_beam_width')} mm, Beam Depth = {form_data.get('timber_beam_depth')} mm\n"
-        calculation_process += f"Calculated Bending Capacity = {moment_capacity} kNm\n"
-        calculation_process += "----------------------------------\n"
+        process_lines.append("Timber Beam Calculation Process:\n----------------------------------\n")
+        process_lines.append(f"Timber Grade: {form_data.get('timber_grade')}\n")
+        process_lines.append(f"Beam Width = {form_data.get('timber_beam_width')} mm, Beam Depth = {form_data.get('timber_beam_depth')} mm\n")
+        process_lines.append(f"Calculated Bending Capacity = {moment_capacity} kNm\n")
+        process_lines.append("----------------------------------\n")
 
     else:
         moment_capacity = 0.0
         shear_capacity = 0.0
-        calculation_process = "No calculation process available.\n"
+        process_lines.append("No calculation process available.\n")
 
     # Effective length reduction for capacity (your original behaviour)
     reduction_factor = 1.0
@@ -559,7 +612,7 @@ def calculate_beam_capacity(form_data, loads):
     if material == "Steel":
         A_steel = 2 * (flange_width * flange_thickness) + web_thickness * web_depth
         self_weight = (A_steel / 1e6) * 7850 * 9.81 / 1000  # kN/m
-        self_weight_moment = ((self_weight * span_length ** 2) / 8) * 1.05  # include 1.05
+        self_weight_moment = ((self_weight * span_length * span_length) / 8) * 1.05  # include 1.05
 
     total_applied_moment = applied_moment + self_weight_moment
     utilisation_ratio = total_applied_moment / moment_capacity if moment_capacity > 0 else float('inf')
@@ -568,7 +621,8 @@ def calculate_beam_capacity(form_data, loads):
     applied_live = applied_moment - additional_dead
     applied_dead = additional_dead + self_weight_moment
 
-    calculation_process += load_breakdown
+    process_lines.append(load_breakdown)
+    calculation_process = "".join(process_lines)
 
     result = {
         "Span Length (m)": round(span_length, 1),
@@ -593,15 +647,9 @@ def calculate_beam_capacity(form_data, loads):
     }
 
     if material == "Steel":
-        slenderness_disp, F_param_disp, v_disp, r_disp = calculate_slenderness(
-            effective_length, web_depth, flange_thickness, flange_width, web_thickness, k4=k4
-        )
         result["k4 (minor-axis)"] = round(k4, 3)
-        result["Slenderness (λ)"] = round(slenderness_disp, 1)
-        result["X Parameter"] = round(
-            slenderness_disp * math.sqrt((230 if steel_grade == "S230" else (275 if steel_grade == "S275" else 355)) / 355.0),
-            1
-        )
+        result["Slenderness (λ)"] = round(slenderness, 1)
+        result["X Parameter"] = round(X, 1)
 
     if material == "Concrete":
         result["Mus (kNm)"] = round(Mus, 1)
@@ -617,57 +665,57 @@ def calculate_beam_capacity(form_data, loads):
     if loading_type == "HA":
         result["HA KEL (kN)"] = round(default_loads.get("kel", 0), 1)
 
-    vehicle_type = form_data.get("vehicle_type", "").strip()
-    vehicle_impact_factor = get_float(form_data.get("vehicle_impact_factor"), 1.0)
-    wheel_dispersion = form_data.get("wheel_dispersion", "none").strip()
-    axle_mode = form_data.get("axle_load_mode", "per beam").strip()
-    if vehicle_type and vehicle_type.lower() != "none":
-        vehicle_results = calculate_vehicle_loads(span_length, vehicle_type, vehicle_impact_factor, wheel_dispersion, axle_mode)
+    vehicle_type = inputs.vehicle_type
+    if vehicle_type and vehicle_type != "none":
+        vehicle_results = calculate_vehicle_loads(
+            span_length, vehicle_type, inputs.vehicle_impact_factor, inputs.wheel_dispersion, inputs.axle_load_mode
+        )
         vehicle_results = {k: round(v, 1) for k, v in vehicle_results.items()}
         result.update(vehicle_results)
 
     result["Additional Loads"] = loads
-    logging.debug("Calculation result: %s", result)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Calculation result: %s", result)
     return result
 
-def drange(start, stop, step):
-    r = start
-    while r <= stop:
-        yield r
-        r += step
-
 @app.route("/")
 def home():
     return render_template("index.html", form_data={}, reinforcement_nums=[], reinforcement_diameters=[], reinforcement_covers=[])
 
-@app.route("/calculate", methods=["POST"])
-def calculate():
-    form_data = request.form.to_dict()
-
-    # --- DEBUG: see what the form actually sent ---
-    logging.debug("Form keys: %s", sorted(form_data.keys()))
-    logging.debug("Raw condition_factor from request: %r", request.form.get("condition_factor"))
-
-    additional_loads = []
-    load_desc_list = request.form.getlist("load_desc[]")
-    load_value_list = request.form.getlist("load_value[]")
-    load_type_list = request.form.getlist("load_type[]")
-    load_distribution_list = request.form.getlist("load_distribution[]")
-    load_material_list = request.form.getlist("load_material[]")
+# Lower-case spelling of each option the load-row selects can post
+_LOAD_OPTION_CANON = {option: option.lower() for option in ("dead", "live", "udl", "point", "Steel", "Concrete", "Timber")}
+
+def parse_calculation_form(form):
+    """Parse the submitted calculator form into form data, additional loads and reinforcement lists."""
+    # Every field's values in one pass over the MultiDict; form_data keeps the first
+    fields = form.to_dict(flat=False)
+    form_data = {key: values[0] for key, values in fields.items()}
+
+    load_desc_list = fields.get("load_desc[]", [])
+    load_value_list = fields.get("load_value[]", [])
+    load_type_list = fields.get("load_type[]", [])
+    load_distribution_list = fields.get("load_distribution[]", [])
+    load_material_list = fields.get("load_material[]", [])
+
+    # One pass over the load rows; rows without a value are skipped before any conversion
+    canon = _LOAD_OPTION_CANON.get
+    additional_loads = [
+        {
+            "description": desc,
+            "value": get_float(value),
+            "type": canon(ltype) or ltype.strip().lower(),
+            "load_distribution": canon(distr) or distr.strip().lower(),
+            "load_material": canon(mat) or mat.strip().lower()
+        }
+        for desc, value, ltype, distr, mat in zip(load_desc_list, load_value_list, load_type_list, load_distribution_list, load_material_list)
+        if value.strip()
+    ]
     
-    for desc, value, ltype, distr, mat in zip(load_desc_list, load_value_list, load_type_list, load_distribution_list, load_material_list):
-        if value.strip():
-            additional_loads.append({
-                "description": desc,
-                "value": get_float(value),
-                "type": ltype.lower(),
-                "load_distribution": distr.lower(),
-                "load_material": mat.lower()
-            })
-    
-    reinforcement_nums = request.form.getlist("reinforcement_num[]")
-    reinforcement_diameters = request.form.getlist("reinforcement_diameter[]")
-    reinforcement_covers = request.form.getlist("reinforcement_cover[]")
+    reinforcement = {
+        "reinforcement_nums": fields.get("reinforcement_num[]", []),
+        "reinforcement_diameters": fields.get("reinforcement_diameter[]", []),
+        "reinforcement_covers": fields.get("reinforcement_cover[]", []),
+    }
     
     form_data["load_desc[]"] = load_desc_list
     form_data["load_value[]"] = load_value_list
@@ -675,56 +723,122 @@ def calculate():
     form_data["load_distribution[]"] = load_distribution_list
     form_data["load_material[]"] = load_material_list
 
-    result = calculate_beam_capacity(form_data, additional_loads)
+    return form_data, additional_loads, reinforcement
+
+@lru_cache(maxsize=512)
+def _cached_beam_capacity(fields, loads, reinforcement):
+    """calculate_beam_capacity for frozen, already-parsed form data.
+
+    fields holds the single-valued form fields, loads the (key, value) pairs of
+    each load row and reinforcement the (name, values) pairs of the bar lists,
+    as built by _beam_capacity; the form itself is never parsed again here.
+    """
+    return calculate_beam_capacity(dict(fields), [dict(load) for load in loads], dict(reinforcement))
+
+def _beam_capacity(form_data, additional_loads, reinforcement):
+    """Cached calculation result for a parsed form, with its load rows attached."""
+    result = dict(_cached_beam_capacity(
+        frozenset((key, value) for key, value in form_data.items() if not key.endswith("[]")),
+        tuple(tuple(load.items()) for load in additional_loads),
+        tuple((name, tuple(values)) for name, values in reinforcement.items()),
+    ))
+    # Copy above so the cached result is never mutated by the caller
     result["Additional Loads"] = additional_loads
-    return render_template("index.html", result=result, form_data=form_data,
-                           reinforcement_nums=reinforcement_nums,
-                           reinforcement_diameters=reinforcement_diameters,
-                           reinforcement_covers=reinforcement_covers)
+    return result
+
+@app.route("/calculate", methods=["POST"])
+def calculate():
+    form_data, additional_loads, reinforcement = parse_calculation_form(request.form)
+
+    # --- DEBUG: see what the form actually sent ---
+    logger.debug("Form keys: %s", sorted(form_data.keys()))
+    logger.debug("Raw condition_factor from request: %r", request.form.get("condition_factor"))
+
+    result = _beam_capacity(form_data, additional_loads, reinforcement)
+    return render_template("index.html", result=result, form_data=form_data, **reinforcement)
+
+def _json_result(form):
+    """Cached calculation result for a submitted form."""
+    return _beam_capacity(*parse_calculation_form(form))
+
+@app.route("/calculate.json", methods=["POST"])
+def calculate_json():
+    """Same calculation as /calculate, returned as JSON instead of a rendered page."""
+    result = _json_result(request.form)
+    return jsonify(result), 400 if "error" in result else 200
+
+# Upper bound on items per /calculate/batch request, so one POST cannot queue
+# unbounded work or evict the whole result cache
+_MAX_BATCH_SIZE = 50
+
+def _batch_form(fields):
+    """MultiDict form for one batch item; raises ValueError for a non-scalar value."""
+    form = MultiDict()
+    for key, value in fields.items():
+        for item in (value if isinstance(value, list) else [value]):
+            if item is None:
+                continue
+            # bool is an int subclass, but str(True) is not a field value the form would send
+            if isinstance(item, bool) or not isinstance(item, (str, int, float)):
+                raise ValueError(f"Field {key!r} must be a string or a number.")
+            form.add(key, str(item))
+    return form
+
+@app.route("/calculate/batch", methods=["POST"])
+def calculate_batch():
+    """Run several calculations in one request.
+
+    The body is a JSON array of at most _MAX_BATCH_SIZE objects mapping form
+    field names to a string or number, or to a list of them for the repeated
+    fields (load_value[] etc.); null values are ignored. Returns a JSON array of
+    results in the same order; a failed item carries an "error" key.
+    """
+    forms = request.get_json(silent=True)
+    if not isinstance(forms, list) or not all(isinstance(fields, dict) for fields in forms):
+        return jsonify({"error": "Expected a JSON array of form objects."}), 400
+    if len(forms) > _MAX_BATCH_SIZE:
+        return jsonify({"error": f"A batch may contain at most {_MAX_BATCH_SIZE} forms."}), 413
+
+    results = []
+    for fields in forms:
+        try:
+            results.append(_json_result(_batch_form(fields)))
+        except (ValueError, ZeroDivisionError) as exc:
+            results.append({"error": str(exc)})
+    return jsonify(results)
+
+@lru_cache(maxsize=None)
+def _breakdown_stylesheet():
+    """static/breakdown.css parsed by WeasyPrint, once per worker on the first PDF request."""
+    from weasyprint import CSS
+    return CSS(filename=os.path.join(app.static_folder, "breakdown.css"))
 
 @app.route("/download-pdf", methods=["POST"])
 def download_pdf():
-    form_data = request.form.to_dict()
-    additional_loads = []
-    load_desc_list = request.form.getlist("load_desc[]")
-    load_value_list = request.form.getlist("load_value[]")
-    load_type_list = request.form.getlist("load_type[]")
-    load_distribution_list = request.form.getlist("load_distribution[]")
-    load_material_list = request.form.getlist("load_material[]")
-    
-    for desc, value, ltype, distr, mat in zip(load_desc_list, load_value_list, load_type_list, load_distribution_list, load_material_list):
-        if value.strip():
-            additional_loads.append({
-                "description": desc,
-                "value": get_float(value),
-                "type": ltype.lower(),
-                "load_distribution": distr.lower(),
-                "load_material": mat.lower()
-            })
-    
-    reinforcement_nums = request.form.getlist("reinforcement_num[]")
-    reinforcement_diameters = request.form.getlist("reinforcement_diameter[]")
-    reinforcement_covers = request.form.getlist("reinforcement_cover[]")
-    
-    form_data["load_desc[]"] = load_desc_list
-    form_data["load_value[]"] = load_value_list
-    form_data["load_type[]"] = load_type_list
-    form_data["load_distribution[]"] = load_distribution_list
-    form_data["load_material[]"] = load_material_list
+    # Imported here so workers only load WeasyPrint and its native libraries when a PDF is requested
+    from weasyprint import HTML
 
-    result = calculate_beam_capacity(form_data, additional_loads)
-    result["Additional Loads"] = additional_loads
+    form_data, additional_loads, reinforcement = parse_calculation_form(request.form)
+
+    # Same cache as /calculate, so downloading the PDF for a result just shown is a hit
+    result = _beam_capacity(form_data, additional_loads, reinforcement)
+
+    rendered = render_template("breakdown.html", result=result, form_data=form_data, **reinforcement)
+    pdf = BytesIO()
+    HTML(string=rendered).write_pdf(target=pdf, stylesheets=[_breakdown_stylesheet()])
+    pdf.seek(0)
+    return send_file(pdf, mimetype="application/pdf", as_attachment=True,
+                     download_name="calculation_breakdown.pdf")
+
+# Compile both templates at import so that, with gunicorn's preload_app, workers
+# inherit them from the master instead of each compiling them on first use
+app.jinja_env.get_template("index.html")
+app.jinja_env.get_template("breakdown.html")
 
-    rendered = render_template("breakdown.html", result=result, form_data=form_data,
-                               reinforcement_nums=reinforcement_nums,
-                               reinforcement_diameters=reinforcement_diameters,
-                               reinforcement_covers=reinforcement_covers)
-    pdf = HTML(string=rendered).write_pdf()
-    response = make_response(pdf)
-    response.headers["Content-Type"] = "application/pdf"
-    response.headers["Content-Disposition"] = "attachment; filename=calculation_breakdown.pdf"
-    return response
+# WSGI entry point for production: `gunicorn app:application` (settings in gunicorn.conf.py)
+application = app
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    # Threaded development server; FLASK_DEBUG=1 turns on the debugger and reloader
+    app.run()
 
@@ -1,4 +1,22 @@
 import math
+from types import MappingProxyType
+
+# Material properties (Example values - Should be refined based on Eurocode/BS)
+# Read-only so the shared table cannot be altered by a caller
+_MATERIAL_PROPERTIES = MappingProxyType({
+    "Steel": MappingProxyType({"fy": 355, "E": 210e3}),  # Yield strength (MPa), Elastic modulus (MPa)
+    "Concrete": MappingProxyType({"fck": 30, "E": 30e3}),
+    "Composite": MappingProxyType({"fck": 40, "fy": 275, "E": 180e3}),
+})
+
+# safety_factors is keyed by lower-case material name; resolve each key once at import
+_SAFETY_FACTOR_KEYS = MappingProxyType({material: material.lower() for material in _MATERIAL_PROPERTIES})
+
+# Bridge type -> (moment divisor, shear divisor) for a UDL over the span
+_BRIDGE_COEFFS = MappingProxyType({
+    "Simply Supported": (8.0, 2.0),
+    "Cantilever": (2.0, 1.0),
+})
 
 def calculate_bridge_capacity(
     bridge_type: str,
@@ -17,37 +35,28 @@ def calculate_bridge_capacity(
     - material (str): Material type (Concrete, Steel, Composite)
     - beam_section (str): Beam section type (I-beam, Box Girder, etc.)
     - applied_loads (dict): Dictionary with load values (e.g., {"traffic": 50, "wind": 10})
-    - safety_factors (dict): Dictionary with safety factors (e.g., {"steel": 1.05, "concrete": 1.3})
+    - safety_factors (dict): Safety factors keyed by lower-case material (e.g., {"steel": 1.05, "concrete": 1.3})
     
     Returns:
     - dict: Results containing moment, shear capacity, and pass/fail status
     """
     
-    # Material properties (Example values - Should be refined based on Eurocode/BS)
-    material_properties = {
-        "Steel": {"fy": 355, "E": 210e3},  # Yield strength (MPa), Elastic modulus (MPa)
-        "Concrete": {"fck": 30, "E": 30e3},
-        "Composite": {"fck": 40, "fy": 275, "E": 180e3},
-    }
-    
-    if material not in material_properties:
+    if material not in _MATERIAL_PROPERTIES:
         raise ValueError("Material not recognized.")
     
     # Load factors
     load_factor = sum(applied_loads.values())
     
     # Basic Moment and Shear Capacity Calculations (Simplified)
-    if bridge_type == "Simply Supported":
-        moment_capacity = (load_factor * span_length ** 2) / 8
-        shear_capacity = load_factor * span_length / 2
-    elif bridge_type == "Cantilever":
-        moment_capacity = (load_factor * span_length ** 2) / 2
-        shear_capacity = load_factor * span_length
-    else:
+    coeffs = _BRIDGE_COEFFS.get(bridge_type)
+    if coeffs is None:
         raise ValueError("Unsupported bridge type.")
+    moment_div, shear_div = coeffs
+    moment_capacity = (load_factor * span_length * span_length) / moment_div
+    shear_capacity = load_factor * span_length / shear_div
     
     # Apply material safety factor
-    safety_factor = safety_factors.get(material.lower(), 1.0)
+    safety_factor = safety_factors.get(_SAFETY_FACTOR_KEYS[material], 1.0)
     moment_capacity /= safety_factor
     shear_capacity /= safety_factor
     
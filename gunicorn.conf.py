@@ -0,0 +1,14 @@
+# Gunicorn settings, read automatically by `gunicorn app:application`
+import os
+
+bind = "0.0.0.0:" + os.environ.get("PORT", "8000")
+
+# Several worker processes, each with a couple of threads so a slow PDF render
+# does not block other requests on the same worker
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+worker_class = "gthread"
+threads = 2
+
+# Import app.py once in the master and fork the workers from it, so module-level
+# tables are shared copy-on-write rather than rebuilt in every worker
+preload_app = True